@@ -3,10 +3,19 @@
 
 # pylint: disable=too-many-arguments
 
+from functools import lru_cache
 import os
 
 from PIL import Image, ImageDraw, ImageFont
 
+@lru_cache(maxsize=None)
+def load_font(font, font_size):
+    """Load font (cached, as most icons share few font + size combinations)"""
+    try:
+        return ImageFont.truetype(font, font_size)
+    except IOError:
+        return ImageFont.load_default()
+
 def create_text_icon(text, font, size, output_path, tunex=0, tuney=0, fill='black'):
     """Create icon from text"""
 
@@ -18,11 +27,7 @@ def create_text_icon(text, font, size, output_path, tunex=0, tuney=0, fill='blac
     img = Image.new("RGBA", (size, size), (255, 255, 255, 0))
     draw = ImageDraw.Draw(img)
 
-    font_size = int(size * 0.8)
-    try:
-        font = ImageFont.truetype(font, font_size)
-    except IOError:
-        font = ImageFont.load_default()
+    font = load_font(font, int(size * 0.8))
 
     center = (size // 2 + tunex * size, size // 2 + tuney * size)
     draw.text(center, text, font=font, fill=fill, anchor="mm")
@@ -4,6 +4,8 @@
 # pylint: disable=broad-exception-caught
 # pylint: disable=invalid-name
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
 import sys
 
@@ -12,10 +14,11 @@ from fontTools.ttLib import TTFont
 def font_supports_char(font_path, char):
     """Determine if font supports given char"""
     try:
-        font = TTFont(font_path)
-        for table in font['cmap'].tables:
-            if ord(char) in table.cmap:
-                return True
+        # lazy: only the cmap table gets parsed, not the whole font
+        with TTFont(font_path, lazy=True) as font:
+            for table in font['cmap'].tables:
+                if ord(char) in table.cmap:
+                    return True
     except Exception:
         pass
     return False
@@ -35,9 +38,11 @@ if __name__ == "__main__":
                     if f.lower().endswith(('.ttf', '.otf', '.ttc', '.woff', '.woff2')):
                         font_files.append(os.path.join(root, f))
 
-        # Check which fonts support the character
-        for font_path in font_files:
-            if font_supports_char(font_path, char):
-                print(f"{char} supported by: {font_path}")
+        # Check which fonts support the character (mostly I/O, so threads help)
+        with ThreadPoolExecutor() as executor:
+            supported = executor.map(partial(font_supports_char, char=char), font_files)
+            for font_path, is_supported in zip(font_files, supported):
+                if is_supported:
+                    print(f"{char} supported by: {font_path}")
 
     main()
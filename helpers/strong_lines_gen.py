@@ -1,22 +1,18 @@
 """Generator for strong_lines.*"""
 
-# pip install requests requests_cache beautifulsoup4 --break-system-packages
+# pip install requests requests_cache --break-system-packages
 
 # pylint: disable=duplicate-code
 
+from concurrent.futures import ThreadPoolExecutor
+import html
 import os
 import re
 
-from bs4 import BeautifulSoup
 import requests
 import requests_cache
 from jinja2 import Environment, FileSystemLoader
 
-cache_dir = os.path.expanduser("~/.cache/tobes-ui")
-os.makedirs(cache_dir, exist_ok=True)
-cache_path = os.path.join(cache_dir, "strong_lines_request_cache")
-requests_cache.install_cache(cache_path, expire_after=7*24*3600)
-
 ELEMENT_URLS = {
     "Ar": "https://physics.nist.gov/PhysRefData/Handbook/Tables/argontable2_a.htm",
     "C": "https://www.physics.nist.gov/PhysRefData/Handbook/Tables/carbontable2_a.htm",
@@ -31,6 +27,14 @@ ELEMENT_URLS = {
     "Xe": "https://physics.nist.gov/PhysRefData/Handbook/Tables/xenontable2_a.htm"
 }
 
+# All that's needed from a page is the text of its first <pre> block
+PRE_RE = re.compile(r"<pre\b[^>]*>(.*?)</pre>", re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]+>")
+# A line of the table: intensity, flags, wavelength [Å], element, ionization
+LINE_RE = re.compile(r"^\s*(\d+)\s*([A-Za-z,*]*)\s+([\d.]+)\s+..\s+([IV]+)")
+# Å -> nm (moving the decimal point)
+AA_TO_NM_RE = re.compile(r'(\d+)(\d)\.(\d+)')
+
 IONIZATION_MAP = {
     "I": 1,
     "II": 2,
@@ -42,42 +46,54 @@ def parse_pre_block(text):
     """Parses <pre> block from the html."""
     data = []
     for line in text.splitlines():
-        match = re.match(r"^\s*(\d+)\s*([A-Za-z,*]*)\s+([\d.]+)\s+..\s+([IV]+)", line)
+        match = LINE_RE.match(line)
         if match:
-            intensity = int(match.group(1))
-            flags = list(match.group(2)) if match.group(2) else []
-            flags = ''.join([x for x in flags if x != ","])
-            wavelength_aa = match.group(3)
-            ionization = IONIZATION_MAP[match.group(4)]
+            intensity, flags, wavelength_aa, ionization = match.groups()
             data.append([
-                intensity,
-                re.sub(r'(\d+)(\d)\.(\d+)', r'\1.\2\3', wavelength_aa),
-                flags,
-                ionization])
+                int(intensity),
+                AA_TO_NM_RE.sub(r'\1.\2\3', wavelength_aa),
+                flags.replace(",", ""),
+                IONIZATION_MAP[ionization]])
     return data
 
+def pre_block_text(page):
+    """Returns text of the first <pre> block of the html page (empty if there's none)."""
+    pre = PRE_RE.search(page)
+    if not pre:
+        return ""
+    return html.unescape(TAG_RE.sub("", pre.group(1)))
+
 def extract_element_data_from_pre(url):
     """Extracts element data from the page."""
     response = requests.get(url, timeout=120)
-    soup = BeautifulSoup(response.content, "html.parser")
-    pre = soup.find("pre")
-    if not pre:
+    return parse_pre_block(pre_block_text(response.text))
+
+def extract_element(element, url):
+    """Extracts element data from the page; empty on error."""
+    print(f"Extracting {element}...")
+    try:
+        return extract_element_data_from_pre(url)
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        print(f"Error extracting {element}: {ex}")
         return []
-    return parse_pre_block(pre.get_text())
 
 def main():
     """C-like main."""
-    full_data = {}
-    for element, url in ELEMENT_URLS.items():
-        print(f"Extracting {element}...")
-        try:
-            full_data[element] = extract_element_data_from_pre(url)
-        except Exception as ex:  # pylint: disable=broad-exception-caught
-            print(f"Error extracting {element}: {ex}")
-            full_data[element] = []
+    cache_dir = os.path.expanduser("~/.cache/tobes-ui")
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, "strong_lines_request_cache")
+    # Pages are fetched from several threads at once; WAL lets them read the cache concurrently
+    requests_cache.install_cache(cache_path, backend='sqlite', expire_after=7*24*3600,
+                                 fast_save=True, wal=True)
+
+    # Pages are independent (and fetching is I/O bound), so fetch them all at once;
+    # map() keeps the ELEMENT_URLS order for the generated file
+    with ThreadPoolExecutor(max_workers=len(ELEMENT_URLS)) as executor:
+        full_data = dict(zip(ELEMENT_URLS,
+                             executor.map(extract_element, ELEMENT_URLS, ELEMENT_URLS.values())))
 
     # Prepare template
-    env = Environment(loader=FileSystemLoader(os.path.dirname(__file__)))
+    env = Environment(loader=FileSystemLoader(os.path.dirname(__file__)), auto_reload=False)
     template = env.get_template("strong_lines_template.j2")
 
     py_output = os.path.abspath(os.path.join(
@@ -85,10 +101,19 @@ def main():
         "../tobes_ui/strong_lines.py"
     ))
 
-    rendered = template.render(full_data=full_data)
-
-    with open(py_output, "w", encoding="utf-8") as pyfile:
-        pyfile.write(rendered + "\n")
+    # Stream the output straight to disk; via a temp file, so that a failed render
+    # doesn't leave a truncated strong_lines.py behind
+    tmp_output = py_output + ".tmp"
+    try:
+        with open(tmp_output, "w", encoding="utf-8") as pyfile:
+            template.stream(full_data=full_data).dump(pyfile)
+            pyfile.write("\n")
+        os.replace(tmp_output, py_output)
+    except BaseException:
+        # Nor leave the temp file behind in the package tree (also on Ctrl-C)
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
 
     print(f"Wrote: {py_output}")
 
@@ -0,0 +1,46 @@
+"""Tests for minmax_decimate from tobes_ui/calibration/common.py."""
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+
+import unittest
+
+import numpy as np
+
+from tobes_ui.calibration.common import minmax_decimate
+
+
+class TestMinmaxDecimate(unittest.TestCase):
+
+    def test_small_data_untouched(self):
+        x, y = minmax_decimate([1, 2, 3, 4], [5, 1, 7, 2], 2)
+        self.assertEqual(x.tolist(), [1, 2, 3, 4])
+        self.assertEqual(y.tolist(), [5, 1, 7, 2])
+
+    def test_decimation(self):
+        x = np.arange(9)
+        y = np.array([3, 1, 2, 9, 4, 5, 0, 8, 7])
+        x_out, y_out = minmax_decimate(x, y, 3)
+        # bins: [0..2], [3..5], [6..8]
+        self.assertEqual(x_out.tolist(), [0, 2, 3, 5, 6, 8])
+        self.assertEqual(y_out.tolist(), [1, 3, 4, 9, 0, 8])
+
+    def test_envelope_kept(self):
+        rng = np.random.default_rng(42)
+        y = rng.random(2048).astype(np.float32)
+        x = np.linspace(380, 780, 2048)
+        x_out, y_out = minmax_decimate(x, y, 500)
+        self.assertEqual(len(x_out), 1000)
+        self.assertEqual(y_out.dtype, np.float32)
+        self.assertEqual(y_out.max(), y.max())
+        self.assertEqual(y_out.min(), y.min())
+        self.assertEqual((x_out[0], x_out[-1]), (x[0], x[-1]))
+        self.assertTrue(np.all(np.diff(x_out) >= 0))
+
+    def test_no_bins(self):
+        x, y = minmax_decimate([1, 2, 3], [3, 2, 1], 0)
+        self.assertEqual(len(x), 3)
+        self.assertEqual(len(y), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
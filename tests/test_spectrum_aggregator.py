@@ -103,6 +103,20 @@ class TestSpectrumAggregator:
         result2 = agg.add(data2)
         np.testing.assert_array_equal(list(result2.spd.values()), [3.0, 4.0])
 
+    def test_window_size_one_then_grow(self):
+        agg = SpectrumAggregator(window_size=3, func="avg")
+        agg.add(spectrum([1.0], [1.5]))
+
+        agg.window_size = 1
+        result = agg.add(spectrum([3.0], [3.5]))
+        np.testing.assert_array_equal(result.spd_raw, [3.5])
+
+        agg.window_size = 2
+        agg.add(spectrum([5.0], [5.5]))
+        result = agg.add(spectrum([7.0], [7.5]))
+        np.testing.assert_array_almost_equal(list(result.spd.values()), [6.0])
+        np.testing.assert_array_almost_equal(result.spd_raw, [6.5])
+
     def test_invalid_window_size(self):
         aggregator_avg = SpectrumAggregator(window_size=3, func="avg")
 
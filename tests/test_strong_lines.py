@@ -4,7 +4,7 @@
 
 import unittest
 
-from tobes_ui.strong_lines import (Flag, STRONG_LINES)
+from tobes_ui.strong_lines import (Flag, StrongLines, STRONG_LINES)
 
 
 class TestStrongLines(unittest.TestCase):
@@ -60,6 +60,30 @@ class TestStrongLines(unittest.TestCase):
         self.assertTrue(all(int(l.intensity) in intensity_range for l in persistent_lines_in_range))
         self.assertTrue(all('P' in l.raw_flags for l in persistent_lines_in_range))
 
+    def test_indices_for_intensity_range(self):
+        strong_lines = STRONG_LINES["Ar"]
+        intensity_range = range(200, 1000)
+        indices = strong_lines.indices_for_intensity_range(intensity_range)
+        expected = [i for i, l in enumerate(strong_lines.lines)
+                    if 200 <= l.intensity <= 1000]
+        self.assertEqual(list(indices), expected)
+
+        indices = strong_lines.indices_for_intensity_range(
+                intensity_range, only_persistent=True, ionization=(2,))
+        lines = [strong_lines.lines[i] for i in indices]
+        self.assertTrue(lines)
+        self.assertTrue(all('P' in l.raw_flags for l in lines))
+        self.assertTrue(all(l.ionization == 2 for l in lines))
+        self.assertTrue(all(200 <= l.intensity <= 1000 for l in lines))
+        self.assertEqual(lines, [l for l in strong_lines.persistent_lines
+                                 if l.ionization == 2 and 200 <= l.intensity <= 1000])
+
+    def test_cached_arrays_ignored_by_repr_and_eq(self):
+        strong_lines = STRONG_LINES["H"]
+        copy = StrongLines(strong_lines.element, strong_lines.lines, strong_lines.persistent_lines)
+        self.assertEqual(copy, strong_lines)
+        self.assertNotIn('_intensities', repr(copy))
+
     def test_for_wavelength_and_intensity_range(self):
         strong_lines = STRONG_LINES["H"]
         wave_range = range(90, 131)
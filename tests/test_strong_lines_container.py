@@ -60,6 +60,20 @@ class TestStrongLinesContainer(unittest.TestCase):
         result = self.container.find_in_range(600, 700)
         self.assertEqual(result, [])
 
+    def test_count_in_ranges(self):
+        # Should match len(find_in_range) for every range (inclusive at both ends)
+        mins = [430, 410.2, 447.1, 411, 0, 600]
+        maxs = [450, 447.1, 447.1, 433.9, 400, 700]
+        counts = self.container.count_in_ranges(mins, maxs)
+        self.assertEqual(list(counts), [2, 3, 1, 0, 0, 0])
+        for min_val, max_val, count in zip(mins, maxs, counts):
+            self.assertEqual(len(self.container.find_in_range(min_val, max_val)), count)
+
+    def test_count_in_ranges_empty(self):
+        self.assertEqual(list(self.container.count_in_ranges([], [])), [])
+        empty_container = StrongLinesContainer({})
+        self.assertEqual(list(empty_container.count_in_ranges([0, 10], [1000, 20])), [0, 0])
+
     def test_plot_data_integrity(self):
         keys, values = self.container.plot_data()
         self.assertEqual(keys, self.expected_plot_data[0])
@@ -92,6 +106,17 @@ class TestStrongLinesContainer(unittest.TestCase):
         self.assertEqual(keys, [410.2, 434.0])
         self.assertEqual(values, [8, 12])
 
+    def test_plot_arrays(self):
+        for min_val, max_val in [(None, None), (430, 450), (447.1, None), (None, 434.0),
+                                 (600, 700)]:
+            keys, values = self.container.plot_arrays(min_val, max_val)
+            expected_keys, expected_values = self.container.plot_data(min_val, max_val)
+            self.assertEqual(keys.tolist(), expected_keys)
+            self.assertEqual(values.tolist(), expected_values)
+            self.assertFalse(keys.flags.writeable)
+        keys, values = StrongLinesContainer({}).plot_arrays(0, 1000)
+        self.assertEqual((len(keys), len(values)), (0, 0))
+
     def test_plot_data_out_of_range(self):
         keys, values = self.container.plot_data(600, 700)
         self.assertEqual(keys, [])
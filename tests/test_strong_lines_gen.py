@@ -0,0 +1,54 @@
+"""Test for helpers/strong_lines_gen.py"""
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+
+import importlib.util
+import os
+import unittest
+
+HELPER = os.path.join(os.path.dirname(__file__), '..', 'helpers', 'strong_lines_gen.py')
+HAVE_DEPS = all(importlib.util.find_spec(mod) for mod in ('requests', 'requests_cache', 'jinja2'))
+HAVE_BS4 = all(importlib.util.find_spec(mod) for mod in ('bs4', 'lxml'))
+
+SAMPLE_PAGE = """<html><head><title>Strong Lines of Hydrogen</title>
+<prefix>9 P 1234.5 H I</prefix></head>
+<body><h1>Strong Lines of Hydrogen ( H )</h1>
+<PRE class="table">
+ Intensity    Vacuum    Spectrum  Reference
+              Wavelength (&Aring;)
+   15  P     1215.668     H I      <a href="#r1">1</a>
+    8  <b>P</b>c   4861.33     H I      <a href="#r2">2</a>
+</PRE>
+<pre>
+   20  P     6562.79      H I      3
+</pre>
+</body></html>
+"""
+
+
+@unittest.skipUnless(HAVE_DEPS, "strong_lines_gen dependencies not installed")
+class TestStrongLinesGen(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        spec = importlib.util.spec_from_file_location('strong_lines_gen', HELPER)
+        cls.gen = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.gen)
+
+    def test_pre_block_text(self):
+        self.assertEqual(self.gen.parse_pre_block(self.gen.pre_block_text(SAMPLE_PAGE)), [
+            [15, '121.5668', 'P', 1],
+            [8, '486.133', 'Pc', 1],
+        ])
+        self.assertEqual(self.gen.pre_block_text("<html><prefix>x</prefix></html>"), "")
+
+    @unittest.skipUnless(HAVE_BS4, "beautifulsoup4/lxml not installed")
+    def test_pre_block_text_matches_beautifulsoup(self):
+        from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel,import-error
+        pre = BeautifulSoup(SAMPLE_PAGE, "lxml").find("pre")
+        self.assertEqual(self.gen.parse_pre_block(self.gen.pre_block_text(SAMPLE_PAGE)),
+                         self.gen.parse_pre_block(pre.get_text()))
+
+
+if __name__ == "__main__":
+    unittest.main()
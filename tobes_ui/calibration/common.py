@@ -3,20 +3,25 @@
 # pylint: disable=invalid-name
 
 import abc
+import time
 
 import tkinter as tk
 from tkinter import ttk
 
+from matplotlib.transforms import Bbox
+import numpy as np
+
 class ToolTip:
     """Tool tip widget for arbitrary Tk element."""
 
     def __init__(self, widget, text, delay=500, above=False):
         self.widget = widget
-        self.text = text
+        self.text = text if callable(text) else str(text)
         self.delay = delay  # milliseconds
         self.tooltip = None
         self.after_id = None
         self.above = above
+        self._last_motion = None  # time.monotonic() of last motion while waiting to show
 
         self.widget.bind("<Enter>", self.schedule)
         self.widget.bind("<Leave>", self.hide_tooltip)
@@ -33,6 +38,14 @@ class ToolTip:
         """Actually create and display the tooltip."""
         if self.tooltip is not None or self.after_id is None:
             return
+
+        # Mouse moved since the schedule? Wait for the rest of the delay.
+        if self._last_motion is not None:
+            remaining = self.delay - (time.monotonic() - self._last_motion) * 1000
+            self._last_motion = None
+            if remaining > 0:
+                self.after_id = self.widget.after(int(remaining) + 1, self.show_tooltip)
+                return
         self.after_id = None
 
         x = self.widget.winfo_rootx() + 20
@@ -47,7 +60,7 @@ class ToolTip:
 
         label = tk.Label(
             self.tooltip,
-            text=str(self.text()) if callable(self.text) else str(self.text),
+            text=str(self.text()) if callable(self.text) else self.text,
             background="white",
             justify="left",
             relief="solid",
@@ -79,24 +92,34 @@ class ToolTip:
         if self.after_id:
             self.widget.after_cancel(self.after_id)
             self.after_id = None
+        self._last_motion = None
         if self.tooltip:
             self.tooltip.destroy()
             self.tooltip = None
 
     def move(self, _event):
-        """Optional: reschedule if the mouse moves inside the widget."""
+        """Optional: reschedule if the mouse moves inside the widget.
+
+        Only notes the time of the motion (no Tk calls), the pending show_tooltip
+        then pushes itself back accordingly.
+        """
         if self.tooltip is None:
             if self.after_id is not None:
-                self.widget.after_cancel(self.after_id)
-                self.after_id = None
-            self.schedule()
+                self._last_motion = time.monotonic()
+            else:
+                self.schedule()
 
 
 class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
-    """Spinbox that holds a number clamped to min_val, max_val range (inclusive)."""
+    """Spinbox that holds a number clamped to min_val, max_val range (inclusive).
+
+    Changes via the spin arrows are debounced (by `debounce` ms), so that a burst of
+    clicks (or a held arrow) emits a single on_change; FocusOut/Return emit right away.
+    """
 
     def __init__(self, parent, min_val=0, max_val=10, initial=None, label_text="", on_change=None,
-                 allow_float=False, increment=1, **kwargs):  # pylint: disable=too-many-arguments
+                 allow_float=False, increment=1, debounce=150,
+                 **kwargs):  # pylint: disable=too-many-arguments
         super().__init__(parent, **kwargs)
 
         self._min_val = min_val
@@ -105,8 +128,11 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
         self._allow_float = allow_float
         self._value_var = tk.StringVar(value=str(initial if initial is not None else self.min_val))
         self._last_valid = self._value_var.get()
+        self._last_typed = self._last_valid  # last numeric(-ish) text, see _on_key
         self._last_emitted = None
         self._disabled = False
+        self._debounce = debounce
+        self._pending_change = None  # after() id of the debounced _change_cb
 
         ttk.Label(self, text=label_text).grid(row=0, column=0, sticky="w")
 
@@ -115,16 +141,15 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
             from_=self.min_val,
             to=self.max_val,
             textvariable=self._value_var,
-            validate="key",
-            validatecommand=(self.register(self._validate), "%P"),
             width=max(len(str(self.min_val)), len(str(self.max_val))),
-            command=self._apply_value,
+            command=lambda: self._apply_value(debounced=True),
             increment=increment
         )
         self._spinbox.grid(row=0, column=1, sticky="e", padx=(5, 0))
 
         self._spinbox.bind("<FocusOut>", lambda e: self._apply_value())
         self._spinbox.bind("<Return>", lambda e: self._apply_value(lose_focus=True))
+        self._spinbox.bind("<KeyRelease>", self._on_key)
 
         self.grid_columnconfigure(0, weight=1)
 
@@ -170,8 +195,21 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
         "Setter for on_change."""
         self._on_change = proc
 
+    def _on_key(self, _event=None):
+        """Per-keystroke check (after the fact, no Tcl validatecommand round trip).
+
+        Reverts the text to the last numeric(-ish) one, if the key made it non-numeric.
+        """
+        value = self._value_var.get()
+        if self._validate(value):
+            self._last_typed = value
+        else:
+            cursor = self._spinbox.index(tk.INSERT)
+            self._value_var.set(self._last_typed)
+            self._spinbox.icursor(max(0, cursor - (len(value) - len(self._last_typed))))
+
     def _validate(self, new_value):
-        """Per-keystroke validation - allow any numeric input."""
+        """Validation - allow any numeric input."""
         if new_value in ("", "-"):
             return True
         if self._allow_float:
@@ -183,8 +221,8 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
         else:
             return new_value.lstrip("-").isdigit()
 
-    def _apply_value(self, lose_focus=False):
-        """Apply and clamp value, trigger on_change."""
+    def _apply_value(self, lose_focus=False, debounced=False):
+        """Apply and clamp value, trigger on_change (possibly debounced)."""
         if lose_focus:
             self.focus()
         self._spinbox.config(from_=self.min_val, to=self.max_val)
@@ -203,14 +241,25 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
             value = float(value_str) if self._allow_float else int(value_str)
 
         self._value_var.set(value_str)
-        self._last_valid = value_str
+        self._last_valid = self._last_typed = value_str
         self._spinbox.selection_clear()
         self._spinbox.icursor(tk.END)
 
-        self._change_cb()
+        if debounced and self._debounce:
+            self._cancel_pending_change()
+            self._pending_change = self.after(self._debounce, self._change_cb)
+        else:
+            self._change_cb()
+
+    def _cancel_pending_change(self):
+        """Cancel debounced _change_cb, if any."""
+        if self._pending_change is not None:
+            self.after_cancel(self._pending_change)
+            self._pending_change = None
 
     def _change_cb(self, *args):
         """Change callback, to be executed when spinbox changes."""
+        self._cancel_pending_change()
         if self._on_change:
             value = self.get()
             if self._last_emitted is None or self._last_emitted != value:
@@ -233,13 +282,18 @@ class ClampedSpinbox(ttk.Frame):  # pylint: disable=too-many-ancestors
         value = max(self.min_val, min(self.max_val, value))
         value_str = str(value)
         self._value_var.set(value_str)
-        self._last_valid = value_str
+        self._last_valid = self._last_typed = value_str
         self._change_cb()
 
     def spinbox(self):
         """Get the underlying spinbox. Used (mainly?) for focus."""
         return self._spinbox
 
+    def destroy(self):
+        """Destroy the widget (and drop pending debounced change, if any)."""
+        self._cancel_pending_change()
+        super().destroy()
+
 
 class CalibrationControlPanel(ttk.LabelFrame, abc.ABC):  # pylint: disable=too-many-ancestors
     """Control panel template."""
@@ -270,6 +324,108 @@ class CalibrationControlPanel(ttk.LabelFrame, abc.ABC):  # pylint: disable=too-m
         """Getter for the state that on_change emits."""
         return self._data
 
+class BlitManager:
+    """Blitting helper for a matplotlib canvas.
+
+    While started, the managed artists are animated: a full draw of the canvas renders
+    only the static parts (and caches them as background), and update() just restores
+    that background and re-renders the managed artists on top of it.
+    """
+
+    def __init__(self, canvas, artists=()):
+        self._canvas = canvas
+        self._artists = list(artists)
+        self._background = None
+        self._last_bbox = None  # region covered by the animated artists on last update()
+        self._active = False
+        self._canvas.mpl_connect('draw_event', self._on_draw)
+
+    @property
+    def active(self):
+        """Is blitting currently active?"""
+        return self._active
+
+    def start(self):
+        """Start blitting (managed artists become animated); triggers full redraw."""
+        for artist in self._artists:
+            artist.set_animated(True)
+        self._active = True
+        self._background = None
+        self._canvas.draw_idle()
+
+    def stop(self):
+        """Stop blitting (managed artists become regular ones); triggers full redraw."""
+        for artist in self._artists:
+            artist.set_animated(False)
+        self._active = False
+        self._background = None
+        self._canvas.draw_idle()
+
+    def _on_draw(self, event):
+        """Callback on full redraw; caches the (fresh) background."""
+        if not self._active or (event is not None and event.canvas != self._canvas):
+            return
+        self._background = self._canvas.copy_from_bbox(self._canvas.figure.bbox)
+        self._last_bbox = None
+        self._draw_animated()
+
+    def _draw_animated(self):
+        """Render all managed artists."""
+        fig = self._canvas.figure
+        for artist in self._artists:
+            fig.draw_artist(artist)
+
+    def _artists_bbox(self):
+        """Region (in display coords) covered by the visible managed artists (None if none).
+
+        Hidden ones are skipped: their extent can be bogus (e.g. unit bbox at the origin),
+        and erasing them is covered by the previous update's bbox anyway.
+        """
+        renderer = self._canvas.get_renderer()
+        bboxes = [(artist.get_clip_on() and artist.get_clip_box())
+                  or artist.get_window_extent(renderer)
+                  for artist in self._artists if artist.get_visible()]
+        return Bbox.union(bboxes) if bboxes else None
+
+    def update(self):
+        """Redraw managed artists only (falls back to full redraw if no background yet)."""
+        if not self._active or self._background is None:
+            self._canvas.draw_idle()
+            return
+        self._canvas.restore_region(self._background)
+        self._draw_animated()
+
+        # Push only the region the artists cover (now and previously) to the screen
+        bbox = self._artists_bbox()
+        dirty = [b for b in (bbox, self._last_bbox) if b is not None]
+        if dirty:
+            self._canvas.blit(Bbox.union(dirty))
+        self._last_bbox = bbox
+
+
+def minmax_decimate(x, y, num_bins):
+    """Decimate line data (x, y) to num_bins (min, max) pairs, to plot it num_bins px wide.
+
+    Keeps the envelope of the line (so peaks don't get lost). Data that has no more
+    than 2*num_bins points is returned as is (as arrays).
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if num_bins < 1 or len(y) <= 2 * num_bins:
+        return x, y
+
+    starts = np.linspace(0, len(y), num_bins + 1, dtype=int)[:-1]
+    ends = np.append(starts[1:], len(y)) - 1
+
+    x_out = np.empty(2 * num_bins, dtype=x.dtype)
+    x_out[0::2] = x[starts]
+    x_out[1::2] = x[ends]
+    y_out = np.empty(2 * num_bins, dtype=y.dtype)
+    y_out[0::2] = np.minimum.reduceat(y, starts)
+    y_out[1::2] = np.maximum.reduceat(y, starts)
+    return x_out, y_out
+
+
 def float_to_string(num, max_len=14):
     """Format float num to string of up to max_len chars, with max precision possible.
 
@@ -2,12 +2,22 @@
 
 # pylint: disable=too-many-ancestors,too-many-instance-attributes
 
+from functools import lru_cache
 import tkinter as tk
 from tkinter import ttk
 
 from tobes_ui.strong_lines import STRONG_LINES
 from tobes_ui.calibration.common import (CalibrationControlPanel, ClampedSpinbox, ToolTip)
 
+@lru_cache(maxsize=None)
+def _strong_lines_for(element, min_intensity, persistent_only, ionization):
+    """Strong lines of element with min. intensity and given ionization levels (cached)."""
+    strong_lines = STRONG_LINES[element]
+    indices = strong_lines.indices_for_intensity_range(range(min_intensity, 1000),
+                                                       persistent_only, ionization)
+    return tuple(strong_lines.lines[i] for i in indices)
+
+
 class StrongLinesControl(CalibrationControlPanel):
     """Control panel for strong lines."""
 
@@ -16,6 +26,7 @@ class StrongLinesControl(CalibrationControlPanel):
         self._max_cols = max(1, max_cols)
         self._vars = {}
         self._checkboxes = {}
+        self._pending_emit = None  # after_idle() id of the coalesced on_change emission
 
         super().__init__(parent, text='Strong lines', **kwargs)
 
@@ -26,16 +37,15 @@ class StrongLinesControl(CalibrationControlPanel):
         self.grid_columnconfigure(0, weight=1)
         ToolTip(self._all_checkboxes, "Element(s) to enable strong lines for")
 
-        row = 0
-        for idx, elem in enumerate(STRONG_LINES.keys()):
-            if idx % self._max_cols == 0:
-                row += 1
+        for col in range(min(self._max_cols, len(STRONG_LINES))):
+            self._all_checkboxes.columnconfigure(col, weight=1)
+        for idx, elem in enumerate(STRONG_LINES):
+            row, col = divmod(idx, self._max_cols)
             self._vars[elem] = tk.BooleanVar(value=False)
             self._checkboxes[elem] = ttk.Checkbutton(self._all_checkboxes, text=elem,
                                                      variable=self._vars[elem],
                                                      command=lambda e=elem: self._change_cb(e))
-            self._checkboxes[elem].grid(column=idx%self._max_cols, row=row, sticky="news")
-            self._all_checkboxes.columnconfigure(idx%self._max_cols, weight=1)
+            self._checkboxes[elem].grid(column=col, row=row, sticky="news")
 
         self._sep = ttk.Separator(self, orient='horizontal')
         self._sep.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
@@ -69,11 +79,10 @@ class StrongLinesControl(CalibrationControlPanel):
         """Change callback, for individual elements (or all when None)."""
         min_int = self._intensity.get()
         pers_only = self._persistent_only.get()
+        ionization = (1 if self._ionization_1.get() else -1,
+                      2 if self._ionization_2.get() else -1)
         def sl_find(elem):
-            ionization = [1 if self._ionization_1.get() else -1,
-                          2 if self._ionization_2.get() else -1]
-            sls = STRONG_LINES[elem].for_intensity_range(range(min_int,1000), pers_only)
-            return [sl for sl in sls if sl.ionization in ionization]
+            return _strong_lines_for(elem, min_int, pers_only, ionization)
 
         if element is not None:
             if self._vars[element].get():
@@ -83,5 +92,19 @@ class StrongLinesControl(CalibrationControlPanel):
         else:
             self._data = {k: sl_find(k) for k, v in self._vars.items() if v.get()}
 
+        # Several quick changes (e.g. toggling a few elements) emit on_change just once
+        if self._on_change and self._pending_emit is None:
+            self._pending_emit = self.after_idle(self._emit_change)
+
+    def _emit_change(self):
+        """Emit (coalesced) on_change with the current data."""
+        self._pending_emit = None
         if self._on_change:
             self._on_change(self._data)
+
+    def destroy(self):
+        """Destroy the widget (and drop pending on_change emission, if any)."""
+        if self._pending_emit is not None:
+            self.after_cancel(self._pending_emit)
+            self._pending_emit = None
+        super().destroy()
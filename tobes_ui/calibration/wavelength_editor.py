@@ -93,24 +93,33 @@ class WavelengthEditor(Dialog):
         tree_frame.grid_rowconfigure(0, weight=1)
 
         def update_references():
-            self._treeview.delete(*self._treeview.get_children())
             self._reference_lines.clear()
+            rows = []
 
             if self._pixel:
                 wavelength = self._pixel_to_wl(self._pixel)
                 for line in sorted(self._reference_lines_lookup(wavelength),
                                    key=lambda e: abs(e.wavelength-wavelength)):
                     self._reference_lines.append(line)
-                    self._treeview.insert(
-                            '',
-                            "end",
-                            values=[
-                                f"{line.wavelength-wavelength:+.2f}",
-                                f"{line.wavelength:.6f}",
-                                f"{line.element} {'I' * line.ionization}",
-                                str(line.intensity),
-                                str(line.raw_flags),
-                                ])
+                    rows.append([
+                        f"{line.wavelength-wavelength:+.2f}",
+                        f"{line.wavelength:.6f}",
+                        f"{line.element} {'I' * line.ionization}",
+                        str(line.intensity),
+                        str(line.raw_flags),
+                    ])
+
+            # Reuse the existing rows (instead of delete all + insert all on every pixel
+            # change); any selection refers to the old lines, so it goes away
+            item_ids = self._treeview.get_children()
+            self._treeview.selection_remove(self._treeview.selection())
+            for item_id, row in zip(item_ids, rows):
+                self._treeview.item(item_id, values=row)
+            for row in rows[len(item_ids):]:
+                self._treeview.insert('', "end", values=row)
+            if len(item_ids) > len(rows):
+                self._treeview.delete(*item_ids[len(rows):])
+            self._treeview.yview_moveto(0)  # closest lines first, as with a fresh list
         update_references()
 
         self._treeview.bind("<<TreeviewSelect>>", self._on_treeview_select)
@@ -90,7 +90,6 @@ class SpectrumAggregator:
             'spd_raw': deque(),
         }
         self._running_sums = {}
-        self._max_deques = {}
         self.func = func
         self.window_size = window_size
 
@@ -109,7 +108,6 @@ class SpectrumAggregator:
             while len(buffer) > value:
                 buffer.popleft()
         self._rebuild_running_sums()
-        self._max_deques.clear()
 
     @property
     def func(self) -> str:
@@ -122,17 +120,13 @@ class SpectrumAggregator:
         if value not in ("avg", "max"):
             raise ValueError("func must be 'avg' or 'max'")
         self._op = value
-        if value == "avg":
-            self._rebuild_running_sums()
-        else:
-            self._max_deques.clear()
+        self._rebuild_running_sums()
 
     def clear(self):
         """Clear all buffers"""
         for _field_name, buffer in self._buffers.items():
             buffer.clear()
         self._running_sums.clear()
-        self._max_deques.clear()
 
     def _rebuild_running_sums(self):
         """Rebuild running sums from current buffer state"""
@@ -147,6 +141,13 @@ class SpectrumAggregator:
 
     def add(self, instance: Spectrum) -> Spectrum:
         """Add value (instance of spectrum) and return aggregated"""
+        if self._window_size == 1:
+            # Nothing to aggregate over; skip copying the sample into the buffers
+            # (a later window resize then starts aggregating from scratch)
+            if self._buffers['spd']:
+                self.clear()
+            return self._compute_aggregate(instance)
+
         for field_name, buffer in self._buffers.items():
             value = getattr(instance, field_name)
             if isinstance(value, dict):
@@ -165,31 +166,11 @@ class SpectrumAggregator:
                 buffer.append(new_array)
                 self._running_sums[field_name] += new_array
 
-            else:  # max
-                if field_name not in self._max_deques:
-                    self._max_deques[field_name] = [deque() for _ in range(len(new_array))]
-                    for arr in buffer:
-                        max_deques = self._max_deques[field_name]
-                        for i, val in enumerate(arr):
-                            while max_deques[i] and max_deques[i][-1] < val:
-                                max_deques[i].pop()
-                            max_deques[i].append(val)
-
+            else:  # max (computed from the buffer as a whole, see _agg_op)
                 if len(buffer) >= self._window_size:
-                    oldest_array = buffer.popleft()
-                    max_deques = self._max_deques[field_name]
-                    for i, val in enumerate(oldest_array):
-                        if max_deques[i] and max_deques[i][0] == val:
-                            max_deques[i].popleft()
-
+                    buffer.popleft()
                 buffer.append(new_array)
 
-                max_deques = self._max_deques[field_name]
-                for i, val in enumerate(new_array):
-                    while max_deques[i] and max_deques[i][-1] < val:
-                        max_deques[i].pop()
-                    max_deques[i].append(val)
-
         return self._compute_aggregate(instance)
 
     def _agg_op(self, field_name):
@@ -200,13 +181,11 @@ class SpectrumAggregator:
             return None
 
         if self._op == "avg":
-            return list(self._running_sums[field_name] / buf_len)
+            return (self._running_sums[field_name] / buf_len).tolist()
 
-        # max
-        if field_name not in self._max_deques:
-            return None
-        max_deques = self._max_deques[field_name]
-        return [dq[0] if dq else float('-inf') for dq in max_deques]
+        # max; a single C-level reduction over the (small) window beats per-value
+        # monotonic deques, which need a Python-level loop over every pixel
+        return np.max(buffer, axis=0).tolist()
 
     def _compute_aggregate(self, template: Any) -> Any:
         if not template.y_axis or template.y_axis == 'counts':
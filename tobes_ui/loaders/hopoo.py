@@ -28,29 +28,32 @@ class HopooLoader(Loader, registered_types=['hpcs']):
                     if not line:
                         continue
                     first = line[0]
+                    if first.isdigit():  # spectral data, by far the most rows; so first
+                        try:
+                            wavelength = int(first)
+                            if last_wl is not None and wavelength < last_wl:
+                                # flicker section?
+                                continue
+                            spd[wavelength] = float(line[1])
+                            last_wl = wavelength
+                        except (ValueError, IndexError):
+                            pass
+                        continue
+
+                    first_lower = first.lower()
                     if first.startswith("Types"):
                         device = line[1]
                     elif first.startswith("Describe"):
                         name = line[1]
-                    elif first.lower().startswith("test date"):
+                    elif first_lower.startswith("test date"):
                         date = line[1]
-                    elif first.lower().startswith("test time"):
+                    elif first_lower.startswith("test time"):
                         time_ = line[1]
                     elif "Integral" in first and "Time" in first:
                         try:
                             int_time = float(line[1])
                         except (ValueError, IndexError):
                             pass
-                    elif first.isdigit():
-                        try:
-                            wavelength = int(first)
-                            if last_wl is not None and wavelength < last_wl:
-                                # flicker section?
-                                continue
-                            spd[wavelength] = float(line[1])
-                            last_wl = wavelength
-                        except (ValueError, IndexError):
-                            pass
         except OSError as exc:
             LOGGER.debug("Error: Couldn't read input CSV: %s", exc)
             raise ValueError(f"Can't read {file}: {exc}") from exc
@@ -63,15 +66,18 @@ class HopooLoader(Loader, registered_types=['hpcs']):
         else:
             raise ValueError(f"Can't read {file}: not enough data for timestamp") from exc
 
-        wl_raw = list(spd.keys())
+        if not spd:
+            raise ValueError(f"Can't read {file}: no spectral data")
+
+        wl_raw = list(spd.keys())  # ascending (see the flicker section skip above)
         return Spectrum(
             status=ExposureStatus.NORMAL,
             exposure=ExposureMode.AUTOMATIC,
             time=int_time,
             spd=spd,
-            wavelength_range=range(int(min(wl_raw)), int(max(wl_raw))),
+            wavelength_range=range(wl_raw[0], wl_raw[-1]),
             wavelengths_raw=wl_raw,
-            spd_raw=[v for k, v in spd.items()],
+            spd_raw=list(spd.values()),
             ts=snap_time,
             name=name,
             device=device,
@@ -4,6 +4,8 @@
 
 import argparse
 import atexit
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
 from enum import Enum
 import json
 import logging
@@ -217,10 +219,13 @@ def _init_meter(meter, argv):
         else:
             print(f'Spectrometer already has exposure value of {argv.exposure} ms.')
 
-    print("Exposure mode:", meter.exposure_mode)
-    print("Exposure time:", meter.exposure_time, 'μs')
+    # Read back what was set, once; the rest of the basic info didn't change (and getting
+    # it anew means more round trips to the device)
+    basic_info = dataclasses.replace(basic_info, exposure_mode=meter.exposure_mode,
+                                     time=meter.exposure_time)
+    print("Exposure mode:", basic_info.exposure_mode)
+    print("Exposure time:", basic_info.time, 'μs')
 
-    basic_info = meter.basic_info
     print("Device basic info: ")
     pprint.pprint(basic_info)
 
@@ -296,11 +301,19 @@ def main():
 
     data = []
     if argv.data:
-        for filename in argv.data:
+        def load(filename):
             try:
-                data.append(Loader.load(filename))
+                return Loader.load(filename), None
             except (OSError, ValueError, json.decoder.JSONDecodeError) as exc:
-                print(f"File '{filename}' couldn't be parsed, skipping: {exc}")
+                return None, exc
+
+        # Loading is mostly I/O, so do the files in parallel (but report in argument order)
+        with ThreadPoolExecutor(max_workers=min(8, len(argv.data))) as executor:
+            for filename, (spectrum, exc) in zip(argv.data, executor.map(load, argv.data)):
+                if exc is None:
+                    data.append(spectrum)
+                else:
+                    print(f"File '{filename}' couldn't be parsed, skipping: {exc}")
 
     if not argv.input_device:
         refresh = RefreshType.DISABLED
@@ -12,7 +12,6 @@ import struct
 import time
 
 import numpy as np
-from scipy.interpolate import interp1d
 
 from tobes_ui.calibration.common import float_to_string
 from tobes_ui.common import AttrDict
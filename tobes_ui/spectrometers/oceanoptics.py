@@ -4,12 +4,12 @@
 
 import copy
 from datetime import datetime
+import logging
 import pprint
 import struct
 import time
 
 import numpy as np
-from scipy.interpolate import interp1d
 try:
     import seabreeze.spectrometers as sb
 except ImportError as iex:
@@ -60,6 +60,7 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
                              f" (available: {available})") from ex
 
         self._consts = AttrDict()
+        self._consts_snapshot = None  # See _meta_constants()
 
         if self._spectrometer.serial_number.startswith("FLMS"):
             # According to docs: 0-17 optical black, 18-19 not usable, 20-2047 active
@@ -137,6 +138,13 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
         """Return list of spectrometer-related constants with their values"""
         return copy.deepcopy(self._consts)
 
+    def _meta_constants(self):
+        """Constants for spectrum meta; deep copied once (until the constants change),
+        then every spectrum gets its own shallow copy of that"""
+        if self._consts_snapshot is None:
+            self._consts_snapshot = self.constants()
+        return AttrDict(self._consts_snapshot)
+
     def properties_list(self):
         """Return list of configurable properties"""
         return self._props.properties()
@@ -283,7 +291,7 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
             time_taken += integration_time
             self._set_integration_time(integration_time)
             wls, intensities = self._spectrometer.spectrum()
-            max_intensity = max(intensities[self._consts.first_pixel:])
+            max_intensity = np.max(intensities[self._consts.first_pixel:])
             return [max_intensity, wls, intensities]
 
         target_intensity = self._consts.max_intensity * self._props.auto_max_threshold
@@ -383,8 +391,7 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
             wavelengths = wavelengths[self._consts.first_pixel:]
             intensities = intensities[self._consts.first_pixel:]
 
-            overexp = [k for (k,v) in zip(wavelengths, intensities)
-                       if v == self._consts.max_intensity]
+            overexp = wavelengths[intensities == self._consts.max_intensity]
 
             dark_mean = np.mean(not_used_pixels[self._consts.dark_pixels])
             LOGGER.debug('dark_mean(%d px): %.3f', len(self._consts.dark_pixels), dark_mean)
@@ -405,37 +412,37 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
                     if self._consts.nonlinearity_coeffs:
                         intensities /= np.polyval(self._consts.nonlinearity_coeffs, intensities)
 
-            # Interpolating to whole numbers
+            # Interpolating to whole numbers (linear; edge values outside the range)
             w_new = np.arange(np.floor(wavelengths[0]), np.ceil(wavelengths[-1]) + 1)
-            i_new = interp1d(wavelengths, intensities, kind='linear',
-                             fill_value=(intensities[0], intensities[-1]),
-                             bounds_error=False)(w_new)
-
-            match len(overexp):
-                case 0:
-                    LOGGER.debug("Not overexposed, intensities: (%.3f, %.3f).",
-                                 min(i_new), max(i_new))
-                case 1:
-                    LOGGER.debug('Over-exposed at %.3f, intensities: (%.3f, %.3f).',
-                                 overexp[0], min(i_new), max(i_new))
-                case _:
-                    LOGGER.debug('Over-exposed (%.3f, %.3f), intensities: (%.3f, %.3f).',
-                                 min(overexp), max(overexp), min(i_new), max(i_new))
+            i_new = np.interp(w_new, wavelengths, intensities,
+                              left=intensities[0], right=intensities[-1])
+
+            if LOGGER.isEnabledFor(logging.DEBUG):  # skip the min/max when not logged
+                i_min, i_max = np.min(i_new), np.max(i_new)
+                match len(overexp):
+                    case 0:
+                        LOGGER.debug("Not overexposed, intensities: (%.3f, %.3f).", i_min, i_max)
+                    case 1:
+                        LOGGER.debug('Over-exposed at %.3f, intensities: (%.3f, %.3f).',
+                                     overexp[0], i_min, i_max)
+                    case _:
+                        LOGGER.debug('Over-exposed (%.3f, %.3f), intensities: (%.3f, %.3f).',
+                                     overexp[0], overexp[-1], i_min, i_max)
 
             spectrum=Spectrum(
                     status=ExposureStatus.OVER if len(overexp)>0 else ExposureStatus.NORMAL,
                     exposure=mode,
                     time=exp_time / 1000,  # to ms
-                    spd=dict(zip([int(x) for x in w_new], i_new)),
+                    spd=dict(zip(w_new.astype(int).tolist(), i_new.tolist())),
                     wavelength_range=self.wavelength_range,
-                    wavelengths_raw=list(wavelengths),
-                    spd_raw=list(intensities),
+                    wavelengths_raw=wavelengths.tolist(),
+                    spd_raw=intensities.tolist(),
                     ts=datetime.now(),
                     name=None,
                     device=self.device_id,
                     y_axis="counts",
                     meta={
-                        'constants': self.constants(),
+                        'constants': self._meta_constants(),
                         'properties': self.properties(),
                     }
             )
@@ -463,20 +470,28 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
         """Introspection method to check whether the spectrometer supports WL calibration."""
         return 'eeprom' in self.constants().features
 
+    @staticmethod
+    def _parse_eeprom_float(raw):
+        """Parse float out of raw eeprom slot value (0.0 if unparseable)."""
+        try:
+            # For some reason this can be empty
+            return float(raw.split(b'\x00')[0])
+        except (ValueError, IndexError):
+            return 0.0
+
     def read_wavelength_calibration(self):
         """Read WL calibration: [a3, a2, a1, a0] for polynomial a3*x^3 + a2*x^2 + a1*x + a0."""
-        coeffs = []
+        if 'wavelength_calibration' in self._consts:
+            # Read at init; only changes through write_wavelength_calibration() (which updates it,
+            # or drops it if the write fails)
+            return list(self._consts.wavelength_calibration)
+
         eeprom = self._spectrometer.f.eeprom
         if not eeprom:
             raise ValueError("eeprom access feature not present")
 
         # Slots 1-4 are wavelength calibration
-        for i in range(1, 5):
-            try:
-                # For some reason this can be empty
-                coeffs.append(float(eeprom.eeprom_read_slot(i).split(b'\x00')[0]))
-            except (ValueError, IndexError):
-                coeffs.append(0.0)
+        coeffs = [self._parse_eeprom_float(eeprom.eeprom_read_slot(i)) for i in range(1, 5)]
         # a0, a1, a2, a3 -> a3, a2, a1, a0
         return coeffs[::-1]
 
@@ -495,6 +510,10 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
         slots = [s.ljust(15, b'\x00') for s in slots]
 
         LOGGER.info('about to write WLC: %s', slots)
+        # Drop the cached calibration first: should any of the below fail partway,
+        # reads must go to the (possibly partly rewritten) eeprom
+        self._consts.pop('wavelength_calibration', None)
+        self._consts_snapshot = None
         for i, s in enumerate(slots):
             n = i + 1
             LOGGER.info('writing eeprom slot %d: %s', n, s)
@@ -505,13 +524,17 @@ class OceanOpticsSpectrometer(Spectrometer, registered_types = ['oo', 'ocean', '
         all_ok = True
         LOGGER.info('about to verify WLC written')
         eeprom = self._spectrometer.f.eeprom
+        coeffs = []
         for i, s in enumerate(slots):
             n = i + 1
             r = eeprom.eeprom_read_slot(n)
             if r != s:
                 LOGGER.error('slot %d does not match: want: %s, is: %r', n, s, r)
                 all_ok = False
+            coeffs.append(self._parse_eeprom_float(r))
 
-        self._consts.wavelength_calibration = calibration
+        # What's in the eeprom now (a0, a1, a2, a3 -> a3, a2, a1, a0)
+        self._consts.wavelength_calibration = coeffs[::-1]
+        self._consts_snapshot = None
 
         return all_ok
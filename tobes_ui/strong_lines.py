@@ -3,9 +3,11 @@
 
 # pylint: disable=too-many-lines
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
 class Flag(Enum):
     """Flags for strong line."""
     BAND_HEAD = ('b', 'band head')
@@ -53,6 +55,28 @@ class StrongLines:
     element: str
     lines: list[StrongLine]
     persistent_lines: list[StrongLine]  # lines with 'P' flag
+    # Flat (SoA) view of the lines, for vectorized filtering; filled in by __post_init__
+    _intensities: np.ndarray = field(init=False, repr=False, compare=False)
+    _ionizations: np.ndarray = field(init=False, repr=False, compare=False)
+    _persistent: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_intensities',
+                           np.array([x.intensity for x in self.lines], dtype=np.int64))
+        object.__setattr__(self, '_ionizations',
+                           np.array([x.ionization for x in self.lines], dtype=np.int64))
+        object.__setattr__(self, '_persistent',
+                           np.array(['P' in x.raw_flags for x in self.lines], dtype=bool))
+
+    def indices_for_intensity_range(self, intensity_rng, only_persistent=False, ionization=None):
+        """Return indices (to lines) of lines for given intensity range (and ionizations)."""
+        intensities = self._intensities
+        mask = (intensities >= intensity_rng.start) & (intensities <= intensity_rng.stop)
+        if only_persistent:
+            mask &= self._persistent
+        if ionization is not None:
+            mask &= np.isin(self._ionizations, list(ionization))
+        return np.flatnonzero(mask)
 
     def for_wavelength_range(self, wave_rng, only_persistent=False):
         """Return list of lines for given wavelength range."""
@@ -61,8 +85,8 @@ class StrongLines:
 
     def for_intensity_range(self, intensity_rng, only_persistent=False):
         """Return list of lines for given intensity range."""
-        src = self.persistent_lines if only_persistent else self.lines
-        return [x for x in src if intensity_rng.start <= x.intensity <= intensity_rng.stop]
+        return [self.lines[i] for i in self.indices_for_intensity_range(intensity_rng,
+                                                                         only_persistent)]
 
     def for_wavelength_and_intensity_range(self, wave_rng, int_rng, only_persistent=False):
         """Return list of lines for given intensity range."""
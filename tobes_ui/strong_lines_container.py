@@ -4,6 +4,8 @@ import bisect
 from itertools import chain
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 from tobes_ui.strong_lines import StrongLine
 
 class StrongLinesContainer:
@@ -14,6 +16,11 @@ class StrongLinesContainer:
         self._all_lines.sort(key=lambda x: x.wavelength)
         self._keys = [obj.wavelength for obj in self._all_lines]
         self._values = [obj.intensity for obj in self._all_lines]
+        self._keys_array = np.array(self._keys, dtype=np.float64)
+        self._values_array = np.array(self._values, dtype=np.float64)
+        # Handed out (as views) by plot_arrays, so make sure nobody alters them
+        self._keys_array.flags.writeable = False
+        self._values_array.flags.writeable = False
 
     def find_in_range(self, min_val, max_val):
         """Find all strong lines within min/max range"""
@@ -21,6 +28,11 @@ class StrongLinesContainer:
         max_idx = bisect.bisect_right(self._keys, max_val)
         return self._all_lines[min_idx:max_idx]
 
+    def count_in_ranges(self, min_vals, max_vals):
+        """Count strong lines within each of the min/max ranges (vectorized find_in_range)"""
+        return (np.searchsorted(self._keys_array, max_vals, side='right') -
+                np.searchsorted(self._keys_array, min_vals, side='left'))
+
     def plot_data(
         self,
         min_val: Optional[float] = None,
@@ -39,6 +51,17 @@ class StrongLinesContainer:
         filtered_values = self._values[min_idx:max_idx]
         return filtered_keys, filtered_values
 
+    def plot_arrays(
+        self,
+        min_val: Optional[float] = None,
+        max_val: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Same as plot_data, but as (read-only views of) cached arrays"""
+        min_idx = 0 if min_val is None else np.searchsorted(self._keys_array, min_val, 'left')
+        max_idx = (len(self._keys_array) if max_val is None else
+                   np.searchsorted(self._keys_array, max_val, 'right'))
+        return self._keys_array[min_idx:max_idx], self._values_array[min_idx:max_idx]
+
     def __len__(self):
         return len(self._all_lines)
 
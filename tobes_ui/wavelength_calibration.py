@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 """Calibration for Ocean Optics spectrometer"""
 
+import bisect
+import collections
 from enum import Enum
-import queue
+from functools import lru_cache
+import itertools
+import logging
 import pprint # pylint: disable=unused-import
 import sys
 import threading
-import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -14,11 +17,12 @@ from tkinter import ttk, messagebox
 import numpy as np
 import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
 from matplotlib.figure import Figure
 import matplotlib.patches as mpatches
-from scipy.signal import find_peaks
 
-from tobes_ui.calibration.common import ToolTip
+from tobes_ui.calibration.common import BlitManager, ToolTip, minmax_decimate
 from tobes_ui.calibration.strong_lines_control import StrongLinesControl
 from tobes_ui.calibration.integration_control import IntegrationControl
 from tobes_ui.calibration.sampling_control import SamplingControl
@@ -34,6 +38,18 @@ from tobes_ui.spectrometer import ExposureMode, Spectrometer
 from tobes_ui.strong_lines_container import StrongLinesContainer
 
 
+@lru_cache(maxsize=4)
+def _wavelength_axis(polyfit, first_pixel, num_pixels):
+    """Wavelength for each pixel (first_pixel..num_pixels-1) given polyfit coeffs (tuple).
+
+    Cached, because the same polyfit (initial, new) gets re-applied on most x axis changes;
+    the returned array is read-only (shared).
+    """
+    axis = np.polyval(polyfit, np.arange(first_pixel, num_pixels))
+    axis.flags.writeable = False
+    return axis
+
+
 class CaptureState(Enum):
     """State machine of the spectrum capture"""
     PAUSE = 0
@@ -55,8 +71,24 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         self._root.minsize(1200, 800)
 
         self._spectrometer = spectrometer
+        # Sensor pixel range; fixed for the device, and constants() returns a deep copy, so
+        # it's read just once
+        constants = self._spectrometer.constants()
+        self._first_pixel = constants.get('first_pixel', 0)
+        self._num_pixels = constants.get('num_pixels')  # None if unknown
         self._capture_state = CaptureState.PAUSE
-        self._event_queue = queue.Queue()  # TK events submitted from non-main thread
+        # Set on every _capture_state change, so that a paused worker wakes up right away
+        self._capture_state_changed = threading.Event()
+        # TK events submitted from non-main thread (deque's append/popleft are thread-safe)
+        self._event_queue = collections.deque()
+        # Latest captured spectrum not yet processed; older ones get dropped (stale frames)
+        self._spectrum_frames = collections.deque(maxlen=1)
+        # Whether _process_spectrum_frame is already queued (no need to queue another one)
+        self._spectrum_frame_pending = False
+        self._event_queue_interval = 20  # ms until next _process_event_queue (adaptive)
+        self._event_queue_after = None  # after() id of the next _process_event_queue
+        # Capture stopped, but the worker hasn't pushed the last frame (and peaks) yet
+        self._last_frame_pending = False
         self._worker_thread = threading.Thread(target=self._data_refresh_loop, daemon=True)
         self._worker_thread.start()
 
@@ -66,11 +98,19 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         self._new_polyfit_stats = None  # New polyfit stats
         self._x_axis_type = None  # Type of x axis coords (initial, fixed, new)
         self._x_axis_idx = None  # polyfit for the x axis (index for each pixel)
+        self._calibration_points_rows = []  # rows currently shown in calibration points table
+        self._polyfit_table_row_ids = []  # item ids of polyfit table rows
+        self._polyfit_table_cells = {}  # {(row, column): value} shown in polyfit table
 
         self._ui_elements = AttrDict()  # all the different UI elements we need access to
+        self._status_message = None  # text currently shown in the status label
 
-        self._spectrum_agg = SpectrumAggregator(1)
+        self._spectrum_agg = SpectrumAggregator(1)  # fed from worker thread, hence the lock
+        self._spectrum_agg_lock = threading.Lock()
         self._spectrum = None  # Spectrum captured by spectrometer (last)
+        self._line_data = None  # (x, y) of the spectrum line, before decimation
+        self._line_x_source = None  # (x, slice, width) the line's current x data came from
+        self._debug_frame_count = 0  # spectra received (only counted for debug logging)
         self._y_axis_max = SlidingMax(5)
         self._strong_lines = StrongLinesContainer({})
         self._peak_detector = None  # callable to detect peaks in spectrum data
@@ -85,23 +125,40 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         self._setup_ui()
 
         # Kick off event Q processing...
-        self._root.after(0, self._process_event_queue)
+        self._event_queue_after = self._root.after(0, self._process_event_queue)
 
         self._update_status('Ready.')
 
     def _process_event_queue(self):
-        while not self._event_queue.empty():
-            event = self._event_queue.get_nowait()
-            event()
-        if self._capture_state == CaptureState.RUN:
-            # Make queue processing more snappy when capturing...
-            self._root.after(20, self._process_event_queue)
+        busy = (bool(self._event_queue) or self._last_frame_pending
+                or self._capture_state == CaptureState.RUN)
+        while self._event_queue:
+            event = self._event_queue.popleft()
+            try:
+                event()
+            except Exception:  # pylint: disable=broad-exception-caught
+                # One failing event must not stop the pump (and all the UI updates with it)
+                LOGGER.error("Event %s failed", event, exc_info=True)
+        if busy:
+            # Make queue processing snappy when capturing (or events are coming in)...
+            self._event_queue_interval = 20
         else:
-            self._root.after(100, self._process_event_queue)
+            # ... and back off when idle (PAUSE is the default state)
+            self._event_queue_interval = min(self._event_queue_interval * 2, 400)
+        self._event_queue_after = self._root.after(self._event_queue_interval,
+                                                   self._process_event_queue)
+
+    def _wake_event_queue(self):
+        """Processes the event queue soon, e.g. when the worker is about to push events"""
+        if self._event_queue_after is not None:
+            self._root.after_cancel(self._event_queue_after)
+        self._event_queue_interval = 20
+        self._event_queue_after = self._root.after(self._event_queue_interval,
+                                                   self._process_event_queue)
 
     def _push_event(self, event):
         if callable(event):
-            self._event_queue.put(event)
+            self._event_queue.append(event)
         else:
             raise ValueError(f"Event {event} is not callable")
 
@@ -125,13 +182,33 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         paned_window.add(left_frame)
         paned_window.add(right_frame)
 
+        # Both panes' reqwidths are re-read on every resize (nested widgets keep settling
+        # after setup), but paneconfig only runs when a minsize actually changes
+        pane_minsizes = {}  # minsize last applied to each pane
+
+        def _set_pane_minsize(pane, minsize):
+            if pane_minsizes.get(pane) != minsize:
+                paned_window.paneconfig(pane, minsize=minsize)
+                pane_minsizes[pane] = minsize
+
+        pending_resize = None  # after() id of the (debounced) resize
+
         # resize left to min(left minwidth, 30%)
-        def _pw_on_resize(_event):
-            total_width = paned_window.winfo_width()
-            paned_window.paneconfig(left_frame, minsize=left_frame.winfo_reqwidth())
-            paned_window.paneconfig(right_frame, minsize=right_frame.winfo_reqwidth())
-            paned_window.sash_place(0, min(left_frame.winfo_reqwidth(), int(total_width * 0.3)), 0)
+        def _pw_resize(total_width):
+            nonlocal pending_resize
+            pending_resize = None
+            left_width = left_frame.winfo_reqwidth()
+            _set_pane_minsize(left_frame, left_width)
+            _set_pane_minsize(right_frame, right_frame.winfo_reqwidth())
+            paned_window.sash_place(0, min(left_width, int(total_width * 0.3)), 0)
             # TODO: ^^ probably doesn't work as I would expect...
+
+        def _pw_on_resize(event):
+            nonlocal pending_resize
+            # Debounce, so that a burst of events (window drag) results in single resize
+            if pending_resize is not None:
+                paned_window.after_cancel(pending_resize)
+            pending_resize = paned_window.after(50, lambda: _pw_resize(event.width))
         paned_window.bind('<Configure>', _pw_on_resize)
 
     def _setup_calibration_points_table(self, parent):
@@ -222,16 +299,19 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
 
         poly_tree.grid(row=0, column=0, sticky="nsew")
 
+        coeffs = self._initial_polyfit.tolist()
         parameters = [
-            ('X⁰', f"{self._initial_polyfit[3]:e}"),
-            ('X¹', f"{self._initial_polyfit[2]:e}"),
-            ('X²', f"{self._initial_polyfit[1]:e}"),
-            ('X³', f"{self._initial_polyfit[0]:e}"),
+            ('X⁰', f"{coeffs[3]:e}"),
+            ('X¹', f"{coeffs[2]:e}"),
+            ('X²', f"{coeffs[1]:e}"),
+            ('X³', f"{coeffs[0]:e}"),
             ('R²',   "    n/a    "),
             ('Serr', "    n/a    ")
         ]
-        for param, initial_val in parameters:
-            poly_tree.insert('', 'end', values=(param, initial_val, '-'))
+        # Rows are created once (and later only updated in place), so keep their ids
+        self._polyfit_table_row_ids = [
+                poly_tree.insert('', 'end', values=(param, initial_val, '-'))
+                for param, initial_val in parameters]
 
         return poly_tree
 
@@ -286,7 +366,7 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         self._ui_elements.status_label.grid(row=0, column=0, sticky="nsew", padx=5)
         self._update_status('Initializing...')
         ToolTip(self._ui_elements.status_label,
-                text=lambda: 'Status:\n' + self._ui_elements.status_label.cget('text'), above=True)
+                text=lambda: f'Status:\n{self._status_message or ""}', above=True)
 
         return left_frame
 
@@ -333,18 +413,24 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
             self._new_polyfit_stats = None
             return
 
-        pixels = np.array(list(self._calibration_points.keys()))
-        values = np.array(list(self._calibration_points.values()))
+        num_points = len(self._calibration_points)
+        pixels = np.fromiter(self._calibration_points.keys(), dtype=np.float64, count=num_points)
+        values = np.fromiter(self._calibration_points.values(), dtype=np.float64,
+                             count=num_points)
 
         degree = 3
-        coeffs = np.polyfit(pixels, values, degree)
-
-        poly = np.poly1d(coeffs)
-        values_pred = poly(pixels)
-        residuals = values - values_pred
-
-        ss_res = np.sum(residuals ** 2)
-        ss_tot = np.sum((values - np.mean(values)) ** 2)
+        # Fit over pixels mapped to [-1, 1] (way better conditioned than raw pixel powers,
+        # which reach ~1e10 for X³); full=True also yields the residual sum of squares
+        # (from the least squares solve), no need to evaluate the polynomial again
+        poly, (residuals, *_) = np.polynomial.Polynomial.fit(pixels, values, degree, full=True)
+        # ... then back to plain coeffs, highest power first (like np.polyfit, or the eeprom)
+        coeffs = np.zeros(degree + 1)
+        std_coeffs = poly.convert().coef
+        coeffs[degree + 1 - len(std_coeffs):] = std_coeffs[::-1]
+
+        ss_res = residuals[0] if len(residuals) else 0.0
+        deviations = values - np.mean(values)
+        ss_tot = np.dot(deviations, deviations)  # sum of squares, without a squared temporary
         r_squared = 1 - (ss_res / ss_tot)
 
         stderr = np.sqrt(ss_res / (len(values) - (degree + 1)))
@@ -356,51 +442,70 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         """Updates polyfit table (and UI state) with current data."""
         self._recalculate_polyfit_data()
 
-        tbl = self._ui_elements.polyfit_table
-        row_to_id = tbl.get_children()
-
         if self._new_polyfit is None:
             if 'x_axis_control' in self._ui_elements:
                 self._ui_elements.x_axis_control.new_enabled(False)
             if 'save_button' in self._ui_elements:
                 self._ui_elements.save_button.config(state='disabled')
-            for i in range(0, 6):
-                tbl.set(row_to_id[i], column="current", value="-")
+            self._set_polyfit_table_cells({(i, 'current'): '-' for i in range(0, 6)})
             return
 
         if 'x_axis_control' in self._ui_elements:
             self._ui_elements.x_axis_control.new_enabled(True)
         if 'save_button' in self._ui_elements:
             self._ui_elements.save_button.config(state='normal')
+        cells = {}
         # Poly
+        initial_coeffs = self._initial_polyfit.tolist()
+        new_coeffs = self._new_polyfit.tolist()
         for i in range(0, 4):
-            tbl.set(row_to_id[i], column="initial", value=f"{self._initial_polyfit[3-i]:e}")
-            tbl.set(row_to_id[i], column="current", value=f"{self._new_polyfit[3-i]:e}")
+            cells[(i, 'initial')] = f"{initial_coeffs[3-i]:e}"
+            cells[(i, 'current')] = f"{new_coeffs[3-i]:e}"
         # R^2
-        tbl.set(row_to_id[4], column="current", value=f"{self._new_polyfit_stats[0]:e}")
+        cells[(4, 'current')] = f"{self._new_polyfit_stats[0]:e}"
         # Serr
-        tbl.set(row_to_id[5], column="current", value=f"{self._new_polyfit_stats[1]:e}")
+        cells[(5, 'current')] = f"{self._new_polyfit_stats[1]:e}"
+        self._set_polyfit_table_cells(cells)
 
         if self._x_axis_type == 'new':
             self._apply_x_axis_ctrl({'mode': self._x_axis_type})
 
+    def _set_polyfit_table_cells(self, cells):
+        """Sets polyfit table cells ({(row, column): value}), skipping the unchanged ones."""
+        tbl = self._ui_elements.polyfit_table
+        row_to_id = self._polyfit_table_row_ids
+        for (row, column), value in cells.items():
+            if self._polyfit_table_cells.get((row, column)) != value:
+                tbl.set(row_to_id[row], column=column, value=value)
+                self._polyfit_table_cells[(row, column)] = value
+
     def _update_calibration_points_table(self):
         """Updates calibration points table with current data."""
         tbl = self._ui_elements.calibration_points_table
-        tbl.delete(*tbl.get_children())
-        for pixel, new_wl in sorted(self._calibration_points.items()):
-            cur_wl = np.polyval(self._initial_polyfit, pixel)
-            tbl.insert('', 'end', values=(str(pixel), f'{cur_wl:.6f}', f'{new_wl:.6f}'))
+        points = sorted(self._calibration_points.items())
+        cur_wls = np.polyval(self._initial_polyfit, [pixel for pixel, _ in points])
+        rows = [(str(pixel), f'{cur_wl:.6f}', f'{new_wl:.6f}')
+                for (pixel, new_wl), cur_wl in zip(points, cur_wls)]
+
+        # Only touch the rows that differ from what's shown (each Treeview call is a Tcl
+        # round trip); surplus rows get dropped in a single delete.
+        item_ids = tbl.get_children()
+        shown_rows = self._calibration_points_rows
+        for i, row in enumerate(rows):
+            if i >= len(item_ids):
+                tbl.insert('', 'end', values=row)
+            elif i >= len(shown_rows) or shown_rows[i] != row:
+                tbl.item(item_ids[i], values=row)
+        if len(item_ids) > len(rows):
+            tbl.delete(*item_ids[len(rows):])
+        self._calibration_points_rows = rows
 
     def _apply_strong_line_ctrl(self, data):
-        LOGGER.debug("%s", {k: len(v) for k, v in data.items()})
+        if LOGGER.isEnabledFor(logging.DEBUG):  # the summary isn't worth building otherwise
+            LOGGER.debug("%s", {k: len(v) for k, v in data.items()})
         self._strong_lines = StrongLinesContainer(data)
         self._update_plot(references=True)
-        num = len(self._strong_lines)
-        if num > 500:
-            self._update_status(f'Applied {num} references.\n(Super slow mode engaged.)')
-        else:
-            self._update_status(f'Applied {num} references.')
+        self._update_status(f'Applied {len(self._strong_lines)} references.')
 
     def _quit_action(self):
         """Quit button action handler"""
@@ -417,29 +522,63 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
                 # Stop capture
                 LOGGER.debug("Stopping capture...")
                 self._update_status('Stopping capture...')
-                self._capture_state = CaptureState.PAUSE
+                # Keeps the event pump snappy until the last frame is in (which can take
+                # a whole integration); set before the state flip, the worker clears it after
+                self._last_frame_pending = True
+                self._set_capture_state(CaptureState.PAUSE)
                 self._ui_elements.capture_button.config(text="Capture")
+                self._ui_elements.plot_blitter.stop()
+                self._ui_elements.annotation_blitter.start()
+                self._wake_event_queue()  # for the last frame, and peaks detection
 
             case CaptureState.PAUSE:
                 # Start capture
                 LOGGER.debug("Starting capture...")
                 self._update_status('Starting capture...')
                 self._clear_peaks()
-                self._spectrum_agg.clear()
-                self._capture_state = CaptureState.RUN
+                with self._spectrum_agg_lock:
+                    self._spectrum_agg.clear()
+                self._set_capture_state(CaptureState.RUN)
                 self._ui_elements.capture_button.config(text="Freeze")
+                self._ui_elements.annotation_blitter.stop()
+                self._ui_elements.plot_blitter.start()
+                self._wake_event_queue()
 
             case _:
                 # Ignore
                 LOGGER.debug("unhandled state: %s", self._capture_state)
                 self._update_status(f'Capture error: {self._capture_state}')
 
+    def _set_capture_state(self, state):
+        """Sets capture state (and wakes up the worker thread, if paused)"""
+        self._capture_state = state
+        self._capture_state_changed.set()
+
+    def _aggregate_spectrum(self, spectrum):
+        """Aggregates captured spectrum (runs in the worker thread, off the Tk mainloop)"""
+        spectrum.spd = {1: 1}  # Optimization to save some time, because we don't use `spd`
+        with self._spectrum_agg_lock:
+            aggregated = self._spectrum_agg.add(spectrum)
+        # Counts (<= 16 bit ADC) fit float32 just fine; converting once here spares the
+        # plot, peak detection, etc. from re-converting the list (at half the bytes).
+        aggregated.spd_raw = np.asarray(aggregated.spd_raw, dtype=np.float32)
+        return aggregated
+
+    def _process_spectrum_frame(self):
+        """Processes the latest captured spectrum (if not processed by an earlier event)"""
+        # Cleared before the pop, so a frame appended afterwards queues a new event
+        self._spectrum_frame_pending = False
+        try:
+            spectrum = self._spectrum_frames.popleft()
+        except IndexError:
+            return
+        self._process_spectrum(spectrum)
+
     def _process_spectrum(self, spectrum):
-        """Processes captured spectrum"""
+        """Processes captured (and already aggregated) spectrum"""
         if 'integration_control' in self._ui_elements:
             self._ui_elements.integration_control.integration_time = spectrum.time
-        spectrum.spd = {1: 1}  # Optimization to save some time, because we don't use `spd`
-        self._spectrum = self._spectrum_agg.add(spectrum)
+        self._spectrum = spectrum
         self._update_plot(spectrum=True)
 
     PEAK_COLORS = AttrDict({
@@ -448,6 +587,9 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
             'single': '#fec615',  # unique match (golden yellow)
             'multi': '#d9544d',  # more than 1 match (pale red)
     })
+    # RGBA of the PEAK_COLORS, indexable by number of matches (0, 1, 2+), 3 for cali point
+    PEAK_PALETTE = to_rgba_array([PEAK_COLORS.none, PEAK_COLORS.single, PEAK_COLORS.multi,
+                                  PEAK_COLORS.cali])
 
     def _update_plot(self, spectrum=False, references=False, peaks=False):
         """Updates plot based on X-Axis config and data"""
@@ -468,14 +610,25 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
 
         if spectrum and self._spectrum:
 
-            line = axis.get_lines()[0]
-
             spd = self._spectrum.spd_raw
-            line.set_data(idx, spd)
-            axis.set_ylabel(self._spectrum.y_axis)
+            self._line_data = (np.asarray(idx), spd)
+            self._set_line_data()
             axis.set_title(f'Spectral Data ({self._spectrum.ts})')
 
-            axis.set_ylim(bottom=0, top=self._y_axis_max.add(max(spd))*ymargin)
+            # If only line + title change, blitting them is enough (no full redraw)
+            blit_only = True
+
+            if axis.get_ylabel() != self._spectrum.y_axis:
+                axis.set_ylabel(self._spectrum.y_axis)
+                blit_only = False
+
+            y_top = self._y_axis_max.add(float(np.max(spd)))*ymargin
+            # Only grow, or shrink by more than 10%: a changed ylim means a full redraw
+            # (instead of a blit), and the sliding max wobbles on nearly every frame
+            cur_bottom, cur_top = axis.get_ylim()
+            if cur_bottom != 0 or not y_top <= cur_top <= y_top / 0.9:
+                axis.set_ylim(bottom=0, top=y_top)
+                blit_only = False
 
             # Set x axis limits (if need be)
             x_axis_limits = [self._x_axis_idx[0] - xmargin, self._x_axis_idx[-1] + 1 + xmargin]
@@ -485,33 +638,27 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
                     self._ui_elements.xaxis_zoom.update_limits(xlim=x_axis_limits)
                 self._x_axis_limits = x_axis_limits
                 references = True  # redraw references on xlimit change
+                blit_only = False
+        else:
+            blit_only = False
 
         if (self._spectrum
             and (((spectrum or references) and self._capture_state != CaptureState.RUN)
                  or peaks)):
             # Update peaks (because they depend on spectrum and refs)
-            constants = self._spectrometer.constants()
-            first_pixel = constants.first_pixel if 'first_pixel' in constants else 0
-
-            def peak_color(pxl):
-                """Colors for peaks, from https://xkcd.com/color/rgb/."""
-                if pxl+first_pixel in self._calibration_points:
-                    return self.PEAK_COLORS.cali
-
-                refs = self._strong_lines.find_in_range(idx[pxl] - self._ref_match_delta[0],
-                                                        idx[pxl] + self._ref_match_delta[1])
-                match len(refs):
-                    case 0:
-                        return self.PEAK_COLORS.none
-                    case 1:
-                        return self.PEAK_COLORS.single
-                    case _:
-                        return self.PEAK_COLORS.multi
+            first_pixel = self._first_pixel
 
             peak_i = self._peaks
-            peak_x = [idx[i] for i in peak_i]
-            peak_y = [self._spectrum.spd_raw[i] for i in peak_i]
-            peak_c = [peak_color(i) for i in peak_i]
+            peak_x = np.asarray(idx, dtype=np.float64)[peak_i]
+            peak_y = self._spectrum.spd_raw[peak_i]
+            # Match all peaks against the references in one go
+            num_refs = self._strong_lines.count_in_ranges(peak_x - self._ref_match_delta[0],
+                                                          peak_x + self._ref_match_delta[1])
+            # ... and color them by index into PEAK_PALETTE (none, single, multi, cali)
+            color_idx = np.minimum(num_refs, 2)
+            color_idx[np.isin(np.asarray(peak_i) + first_pixel,
+                              list(self._calibration_points))] = 3
+            peak_c = self.PEAK_PALETTE[color_idx]
             self._ui_elements.plot_peaks.set_offsets(np.c_[peak_x, peak_y])
             self._ui_elements.plot_peaks.set_facecolor(peak_c)
 
@@ -521,13 +668,6 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
                 self._ui_elements.plot_legend.set_visible(False)
 
         if references:
-            ax2 = fig.axes[1]
-
-            # Remove old
-            for line in ax2.lines:
-                line.remove()
-
-            # Add new, if needed
             ymax = 1000 * ymargin
             xlim = axis.get_xlim()
 
@@ -537,11 +677,43 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
                 valid_x_range = [self._x_axis_limits[0] - xmargin,
                                  self._x_axis_limits[1] + xmargin + 1]
 
-            for x_coord, y_coord in zip(*self._strong_lines.plot_data(*valid_x_range)):
-                ax2.axvline(x=x_coord, color='gray', ymax=y_coord/ymax, linewidth=1, zorder=0)
-            axis.set_xlim(*xlim)
+            # Vertical segments from the bottom, in (x: data, y: axes) coords
+            ref_x, ref_y = self._strong_lines.plot_arrays(*valid_x_range)
+            segments = np.zeros((len(ref_x), 2, 2))
+            segments[:, :, 0] = ref_x[:, np.newaxis]
+            segments[:, 1, 1] = ref_y / ymax
+            self._ui_elements.plot_references.set_segments(segments)
 
-        canvas.draw_idle()
+        if blit_only and not references and not peaks and self._ui_elements.plot_blitter.active:
+            self._ui_elements.plot_blitter.update()
+        else:
+            canvas.draw_idle()
+
+    def _set_line_data(self, *_args):
+        """Sets spectrum line data: its visible part, decimated to the axis width in px.
+
+        Also called when x axis limits (zoom) or canvas size change.
+        """
+        if self._line_data is None or 'plot_canvas' not in self._ui_elements:
+            return
+        idx, spd = self._line_data
+        axis = self._ui_elements.plot_canvas.figure.axes[0]
+        xmin, xmax = axis.get_xlim()
+        # One point beyond the limits on each side, so the line reaches the edges
+        lo_idx = max(np.searchsorted(idx, xmin) - 1, 0)
+        hi_idx = np.searchsorted(idx, xmax, side='right') + 1
+        width = int(axis.bbox.width)
+        line_x, line_y = minmax_decimate(idx[lo_idx:hi_idx], spd[lo_idx:hi_idx], width)
+        # Decimated x only depends on the x axis data, the slice and the width; so while
+        # capturing, it's usually the same and only y needs to be set (and recached)
+        line = axis.get_lines()[0]
+        source = self._line_x_source
+        if (source is not None and source[0] is idx
+                and source[1:] == (lo_idx, hi_idx, width)):
+            line.set_ydata(line_y)
+        else:
+            line.set_data(line_x, line_y)
+            self._line_x_source = (idx, lo_idx, hi_idx, width)
 
     def _clear_peaks(self):
         LOGGER.debug('go')
@@ -552,35 +724,68 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         if self._spectrum is None:
             return
 
-        if self._peak_detector is None:
+        peaks = self._find_peaks(self._spectrum)
+        if peaks is not None:
+            self._set_peaks(peaks)
+
+    def _find_peaks(self, spectrum):
+        """Finds peaks in spectrum (safe to call from the worker thread); None on failure"""
+        peak_detector = self._peak_detector  # read once, it's swapped from the Tk thread
+        if peak_detector is None:
             LOGGER.warning("bug: no peak detector")
-            return
+            return None
+        return list(peak_detector(spectrum.spd_raw))
 
-        self._peaks = list(self._peak_detector(self._spectrum.spd_raw))
+    def _set_peaks(self, peaks):
+        self._peaks = peaks
         LOGGER.debug("Detected %d peaks", len(self._peaks))
         self._update_plot(peaks=True)
 
     def _data_refresh_loop(self):
         # WARNING: Does NOT run in main thread; do not run any Tkinter code here!
-        while True:
-            match self._capture_state:
-                case CaptureState.EXIT:
-                    return
-
-                case CaptureState.PAUSE:
-                    time.sleep(0.1)
-
-                case CaptureState.RUN:
-                    def handle_spectrum(value):
-                        #LOGGER.debug("Got spectrum data with %s status and %.2f integration",
-                        #             value.status, value.time)
-                        self._push_event(lambda: self._process_spectrum(value))
-                        if self._capture_state != CaptureState.RUN:
-                            self._push_event(lambda: self._update_status('Capture stopped.'))
-                            self._push_event(self._detect_peaks)
-                        return self._capture_state == CaptureState.RUN
-                    self._push_event(lambda: self._update_status('Capture running...'))
-                    self._spectrometer.stream_data(handle_spectrum)
+        handlers = {
+            CaptureState.PAUSE: self._pause_tick,
+            CaptureState.RUN: self._run_tick,
+        }  # EXIT (or anything else) ends the loop
+        while (handler := handlers.get(self._capture_state)) is not None:
+            handler()
+
+    def _pause_tick(self):
+        """Single iteration of _data_refresh_loop in PAUSE state (worker thread)"""
+        # Parked until the state changes (the timeout is just a safety net)
+        if self._capture_state_changed.wait(1.0):
+            self._capture_state_changed.clear()
+
+    def _run_tick(self):
+        """Single iteration of _data_refresh_loop in RUN state (worker thread)"""
+        self._push_event(lambda: self._update_status('Capture running...'))
+        self._spectrometer.stream_data(self._on_spectrum)
+
+    def _on_spectrum(self, value):
+        """Spectrum callback for stream_data (worker thread); returns whether to continue"""
+        if LOGGER.isEnabledFor(logging.DEBUG):  # not worth even counting otherwise
+            self._debug_frame_count += 1
+            if self._debug_frame_count % 100 == 1:  # every 100th frame is plenty
+                LOGGER.debug("Got spectrum #%d with %s status and %.2f integration",
+                             self._debug_frame_count, value.status, value.time)
+        spectrum = self._aggregate_spectrum(value)
+        self._spectrum_frames.append(spectrum)
+        if not self._spectrum_frame_pending:
+            # Frames arriving faster than the Tk thread can plot them just replace the
+            # pending one; so the plot updates at display rate, not spectrometer rate
+            self._spectrum_frame_pending = True
+            self._push_event(self._process_spectrum_frame)
+        # Read the state once (it's flipped from the Tk thread meanwhile)
+        running = self._capture_state is CaptureState.RUN
+        if not running:
+            self._push_event(lambda: self._update_status('Capture stopped.'))
+            # Peaks of the last frame get detected here, off the Tk thread; the frame
+            # event above is queued first, so they apply to the plotted spectrum
+            peaks = self._find_peaks(spectrum)
+            if peaks is not None:
+                self._push_event(lambda: self._set_peaks(peaks))
+            self._last_frame_pending = False
+        return running
 
     def _apply_integration_ctrl(self, data):
         """Applies integration control data to spectrometer"""
@@ -603,6 +808,8 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
     def _apply_peak_detect_ctrl(self, data):
         """Applies peak detection control data (configures peak finder)"""
         LOGGER.debug(data)
+        # scipy.signal takes a while to import, and it's only needed for peak detection
+        from scipy.signal import find_peaks  # pylint: disable=import-outside-toplevel
 
         def peak_detector(where):
             prom_percent = (data['prominence'] / 100) * np.max(where)
@@ -627,6 +834,28 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         controls_frame = ttk.Frame(right_frame)
         controls_frame.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
 
+        # Control panels aren't needed for the first paint (and their initial on_change
+        # wants the plot in place anyway), so they get built once the window is up
+        self._root.after_idle(self._setup_controls, controls_frame)
+
+        self._ui_elements.plot = self._setup_plot(right_frame)
+        self._ui_elements.plot.grid(row=1, column=0, sticky='nsew')
+
+        # When mouse over, set focus...
+        self._ui_elements.plot.bind('<Enter>', lambda _event: self._ui_elements.plot.focus_set())
+
+        canvas = self._ui_elements.plot_canvas
+        axis = canvas.figure.axes[0]
+        self._ui_elements.xaxis_zoom = XAxisZoomControl(right_frame, canvas, axis)
+        self._ui_elements.xaxis_zoom.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
+
+        right_frame.grid_columnconfigure(0, weight=1)
+        right_frame.grid_rowconfigure(1, weight=1)
+
+        return right_frame
+
+    def _setup_controls(self, controls_frame):
+        """Sets up the control panels (in controls_frame), reflowing them on resize."""
         if self._spectrometer.exposure_mode == ExposureMode.MANUAL:
             initial_ic = self._spectrometer.exposure_time / 1000
         else:
@@ -651,101 +880,100 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
 
         self._ui_elements.update(controls)
 
-        def _cf_on_resize(event):
-            row = 0
-            col = 0
+        last_layout = [(col, 0) for col in range(len(controls))]  # (col, row) of each control
+        pending_reflow = None  # after() id of the (debounced) reflow
 
-            width = 0
+        def _cf_reflow(frame_width):
+            nonlocal pending_reflow
+            pending_reflow = None
+
+            # Prefix sums of reqwidth (+ padding) of the controls; re-read on every reflow,
+            # as controls can change their reqwidth at runtime
+            control_offsets = list(itertools.accumulate(
+                (ctl.winfo_reqwidth() + 10 for ctl in controls.values()), initial=0))
 
             # TODO: issue with this is that when you start new row, the width can stretch
             # (because when the cell on the next row is wider, it ends up stretching the
             # cell in all rows -- preceding and following)
 
-            for _name, control in controls.items():
-                if width + control.winfo_reqwidth() + 10 > event.width:
-                    row += 1
-                    col = 0
-                    width = 0
-                control.grid(column=col, row=row, sticky="news", padx=5, pady=5)
-                control.grid_columnconfigure(col, weight=1)
-                col += 1
-                width += control.winfo_reqwidth() + 10
-
-        controls_frame.bind('<Configure>', _cf_on_resize)
-
-        self._ui_elements.plot = self._setup_plot(right_frame)
-        self._ui_elements.plot.grid(row=1, column=0, sticky='nsew')
-
-        # When mouse over, set focus...
-        self._ui_elements.plot.bind('<Enter>', lambda _event: self._ui_elements.plot.focus_set())
+            # Greedy rows: each takes as many controls as fit (but at least one)
+            layout = []
+            row = 0
+            start = 0
+            while start < len(controls):
+                end = bisect.bisect_right(control_offsets, control_offsets[start] + frame_width)
+                end = max(end - 1, start + 1)
+                layout.extend((col, row) for col in range(end - start))
+                row += 1
+                start = end
+
+            # Only touch the controls that actually move
+            for control, old_pos, new_pos in zip(controls.values(), last_layout, layout):
+                if old_pos != new_pos:
+                    control.grid(column=new_pos[0], row=new_pos[1], sticky="news", padx=5, pady=5)
+                    control.grid_columnconfigure(new_pos[0], weight=1)
+            last_layout[:] = layout
 
-        canvas = self._ui_elements.plot_canvas
-        axis = canvas.figure.axes[0]
-        self._ui_elements.xaxis_zoom = XAxisZoomControl(right_frame, canvas, axis)
-        self._ui_elements.xaxis_zoom.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
+        def _cf_on_resize(event):
+            nonlocal pending_reflow
+            # Debounce, so that a burst of events (window drag) results in single reflow
+            if pending_reflow is not None:
+                controls_frame.after_cancel(pending_reflow)
+            pending_reflow = controls_frame.after(50, lambda: _cf_reflow(event.width))
 
-        right_frame.grid_columnconfigure(0, weight=1)
-        right_frame.grid_rowconfigure(1, weight=1)
+        controls_frame.bind('<Configure>', _cf_on_resize)
 
-        return right_frame
+        if self._new_polyfit is not None:
+            self._ui_elements.x_axis_control.new_enabled(True)
 
     def _apply_sampling_ctrl(self, data):
         """Applies Sampling Control data"""
         LOGGER.debug(data)
-        self._spectrum_agg.func = data['mode'] or 'avg'
-        self._spectrum_agg.window_size = data['samples'] or 1
+        with self._spectrum_agg_lock:
+            self._spectrum_agg.func = data['mode'] or 'avg'
+            self._spectrum_agg.window_size = data['samples'] or 1
 
     def _apply_x_axis_ctrl(self, data):
         """Applies X-Axis Control data"""
         LOGGER.debug(data)
-        first_pixel = 0
-        num_pixels = 1
-
-        constants = self._spectrometer.constants()
-        if 'first_pixel' in constants:
-            first_pixel = constants['first_pixel']
-        if 'num_pixels' in constants:
-            num_pixels = constants['num_pixels']
-        else:
+        first_pixel = self._first_pixel
+        num_pixels = self._num_pixels
+        if num_pixels is None:
             LOGGER.warning("Can't determine number of pixels, zeroing _x_axis_idx.")
             self._x_axis_idx = None
             self._x_axis_type = 'error'
             return
 
-        pixels = np.array(range(first_pixel, num_pixels))
+        def wl_axis(polyfit):
+            return _wavelength_axis(tuple(polyfit.tolist()), first_pixel, num_pixels)
+
         match data['mode']:
             case 'init':
-                self._x_axis_idx = np.polyval(self._initial_polyfit, pixels)
+                self._x_axis_idx = wl_axis(self._initial_polyfit)
                 self._x_axis_type = 'init'
             case 'fixed':
                 self._x_axis_idx = np.linspace(data['min'], data['max'], num_pixels-first_pixel)
 
             case 'new':
                 if self._new_polyfit is not None:
-                    self._x_axis_idx = np.polyval(self._new_polyfit, pixels)
+                    self._x_axis_idx = wl_axis(self._new_polyfit)
                     self._x_axis_type = 'new'
                 else:
                     LOGGER.warning("_new_polyfit is None, using _initial_polyfit (and shouldn't)")
-                    self._x_axis_idx = np.polyval(self._initial_polyfit, pixels)
+                    self._x_axis_idx = wl_axis(self._initial_polyfit)
                     self._x_axis_type = 'init'
 
             case _:
                 LOGGER.warning("Unhandled x-axis mode %s, using pixels", data)
-                self._x_axis_idx = pixels
+                self._x_axis_idx = np.arange(first_pixel, num_pixels)
                 self._x_axis_type = 'pixels'
 
         self._update_plot(spectrum=True)
 
     def _add_or_edit_pixel_dialog(self, pixel, locked=True):
         """Triggers wavelength editor dialog for given pixel (already added or not)."""
-        first_pixel = 0
-        num_pixels = 1
-
-        constants = self._spectrometer.constants()
-        if 'first_pixel' in constants:
-            first_pixel = constants['first_pixel']
-        if 'num_pixels' in constants:
-            num_pixels = constants['num_pixels']
+        first_pixel = self._first_pixel
+        num_pixels = self._num_pixels or 1
 
         if locked and pixel is not None:
             valid_pixels = [pixel, pixel]
@@ -779,8 +1007,7 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         if event.guiEvent.num in [1, 2, 3]:
             idx = event.ind[-1]
             if idx < len(self._peaks):
-                constants = self._spectrometer.constants()
-                first_pixel = constants.first_pixel if 'first_pixel' in constants else 0
+                first_pixel = self._first_pixel
                 pixel = self._peaks[idx] + first_pixel
                 if event.guiEvent.num == 1:
                     self._add_or_edit_pixel_dialog(pixel)
@@ -803,12 +1030,12 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         self._on_motion(event=None)
 
     def _setup_plot(self, parent):
-        matplotlib.pyplot.rcParams.update({'figure.autolayout': True})
+        matplotlib.rcParams.update({'figure.autolayout': True})
 
         fig = Figure()
         axis = fig.add_subplot(111)
 
-        axis.plot([380, 780], [0, 0], 'b-', linewidth=1)
+        line, = axis.plot([380, 780], [0, 0], 'b-', linewidth=1)
         axis.set_ylim(bottom=0, top=1000*1.02)
         axis.set_xlabel('Wavelength (nm)')
         axis.set_ylabel('Counts')
@@ -832,9 +1059,19 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         ax2.spines['right'].set_visible(True)
         ax2.tick_params(axis='y', which='both', length=0, labelleft=False, labelright=False)
 
+        # All the reference lines (in one collection, updated in place; see _update_plot)
+        self._ui_elements.plot_references = LineCollection(
+                [], colors='gray', linewidths=1, zorder=0, transform=ax2.get_xaxis_transform())
+        ax2.add_collection(self._ui_elements.plot_references, autolim=False)
+
         axis.set_zorder(ax2.get_zorder() + 1)
         axis.set_frame_on(False)
 
+        # Limits are only ever set explicitly (see _update_plot); autoscaling would just
+        # walk the data of all artists (e.g. every reference line) again on draw
+        axis.set_autoscale_on(False)
+        ax2.set_autoscale_on(False)
+
         canvas = FigureCanvasTkAgg(fig, parent)
         canvas.draw()
 
@@ -844,6 +1081,9 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
         canvas.mpl_connect('scroll_event', self._on_plot_scroll)
         canvas.mpl_connect('motion_notify_event', self._on_motion)
         canvas.mpl_connect('key_press_event', self._on_keypress)
+        # Spectrum line is decimated for the visible range and size, see _set_line_data
+        canvas.mpl_connect('resize_event', self._set_line_data)
+        axis.callbacks.connect('xlim_changed', self._set_line_data)
 
         self._ui_elements.pixel_annotation = axis.annotate(
                 "",
@@ -856,6 +1096,12 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
 
 
         self._ui_elements.plot_canvas = canvas
+        # Spectrum line + title get blitted while capturing (see _capture_action)
+        self._ui_elements.plot_blitter = BlitManager(canvas, [line, axis.title])
+        # ... and the pixel annotation while paused (see _on_motion)
+        self._ui_elements.annotation_blitter = BlitManager(
+                canvas, [self._ui_elements.pixel_annotation])
+        self._ui_elements.annotation_blitter.start()
 
         return canvas.get_tk_widget()
 
@@ -884,8 +1130,7 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
             case 'enter':  # Trigger point add based on current annotation...
                 if 'pixel_annotation' in self._ui_elements:
                     annot = self._ui_elements.pixel_annotation
-                    constants = self._spectrometer.constants()
-                    first_pixel = constants.first_pixel if 'first_pixel' in constants else 0
+                    first_pixel = self._first_pixel
                     nearest_idx, _nearest_x = self._nearest_peak(annot.xy[0])
                     if nearest_idx:
                         pixel = nearest_idx + first_pixel
@@ -903,10 +1148,9 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
             return [None, None]
 
         idx = self._x_axis_idx
-        peak_x = np.array([idx[i] for i in self._peaks])
-        distances = np.sqrt((peak_x - x)**2)
+        peak_x = idx[self._peaks]
 
-        nearest = self._peaks[np.argmin(distances)]
+        nearest = self._peaks[np.argmin(np.abs(peak_x - x))]
         return [nearest, idx[nearest]]
 
     def _on_motion(self, event):
@@ -930,14 +1174,14 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
             xdata = None
         nearest_idx, nearest_x = self._nearest_peak(xdata)
 
+        blitter = self._ui_elements.annotation_blitter
         if nearest_idx is None:
             if annot.get_visible():
                 annot.set_visible(False)
-                canvas.draw_idle()
+                blitter.update()
             return
 
-        constants = self._spectrometer.constants()
-        first_pixel = constants.first_pixel if 'first_pixel' in constants else 0
+        first_pixel = self._first_pixel
         pixel = nearest_idx + first_pixel
 
         redraw = False
@@ -998,17 +1242,19 @@ class WavelengthCalibrationGUI: # pylint: disable=too-few-public-methods
 
         if redraw:
             #LOGGER.debug('redraw: %s', nearest_x)
-            canvas.draw_idle()
+            blitter.update()
 
     def _update_status(self, message):
         if 'status_label' in self._ui_elements:
-            self._ui_elements.status_label.config(text=message)
+            if message != self._status_message:  # skip the Tcl round trip if unchanged
+                self._ui_elements.status_label.config(text=message)
+                self._status_message = message
         else:
             print('Status:', message)
 
     def _on_close(self):
         self._update_status('Terminating capture...')
-        self._capture_state = CaptureState.EXIT
+        self._set_capture_state(CaptureState.EXIT)
         if self._worker_thread:
             self._worker_thread.join()
             self._worker_thread = None